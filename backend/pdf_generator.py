@@ -12,10 +12,15 @@ from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 import io
 
 
-def create_market_report_pdf(market_map, market_input):
-    """Create a professional PDF report matching the web design"""
+def create_market_report_pdf(market_map, market_input, buffer=None):
+    """Create a professional PDF report matching the web design.
+
+    The report is written into ``buffer`` (a new BytesIO if none is given),
+    which is returned rewound so it can be streamed without copying.
+    """
     
-    buffer = io.BytesIO()
+    if buffer is None:
+        buffer = io.BytesIO()
     doc = SimpleDocTemplate(
         buffer, 
         pagesize=letter,
@@ -402,4 +407,4 @@ def create_market_report_pdf(market_map, market_input):
     # Build PDF
     doc.build(story)
     buffer.seek(0)
-    return buffer.getvalue()
\ No newline at end of file
+    return buffer
\ No newline at end of file
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -8,16 +8,20 @@ from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Dict, Any, Optional
 import uuid
+import time
 from datetime import datetime
 from together import Together
 import json
 import io
-import pandas as pd
 import re
-from fastapi.responses import StreamingResponse, Response
+from fastapi.responses import StreamingResponse, ORJSONResponse, Response
+import orjson
+import hashlib
 import asyncio
+import functools
 import sys
-from pdf_generator import create_market_report_pdf
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from auth_routes import auth_router, require_auth, get_db
 from auth_models import User
 
@@ -52,6 +56,20 @@ except Exception as e:
     logger.error(f"Failed to initialize Together AI client: {e}")
     together_client = None
 
+# The Together SDK is synchronous; run its calls on a dedicated pool so slow
+# AI requests can't starve the default executor used by other blocking work.
+# Each running analysis holds a worker for its whole AI call (up to minutes),
+# so size it for the expected number of concurrent analyses
+AI_MAX_WORKERS = int(os.environ.get('AI_MAX_WORKERS', '16'))
+AI_EXECUTOR = ThreadPoolExecutor(max_workers=AI_MAX_WORKERS, thread_name_prefix="ai")
+# The /test-integrations probe gets its own pool so it never queues behind analyses
+AI_PROBE_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="ai-probe")
+
+async def run_ai_call(func, executor: ThreadPoolExecutor = AI_EXECUTOR, **kwargs):
+    """Run a blocking Together AI SDK call on an AI thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, **kwargs))
+
 # Create the main app without a prefix
 app = FastAPI()
 
@@ -61,9 +79,26 @@ app.state.db = db
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+def uuid7_str() -> str:
+    """Generate a time-ordered UUID (version 7) as a string.
+
+    Ids from successive analyses sort by creation time, so inserts append to
+    the tail of the "id" indexes instead of landing on random index pages.
+    """
+    unix_ts_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (unix_ts_ms & 0xFFFFFFFFFFFF) << 80
+        | 0x7 << 76                          # version
+        | (rand >> 68) << 64                 # 12 random bits (rand_a)
+        | 0b10 << 62                         # RFC 4122 variant
+        | rand & 0x3FFFFFFFFFFFFFFF          # 62 random bits (rand_b)
+    )
+    return str(uuid.UUID(int=value))
+
 # Define Models
 class MarketInput(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=uuid7_str)
     product_name: str
     industry: str
     geography: str
@@ -164,6 +199,14 @@ class MarketAnalysis(BaseModel):
     market_map: MarketMap
     visual_map: Optional[Dict[str, Any]] = None
 
+# Upper bound on the IDs one POST /analyses:batch request may ask for
+ANALYSIS_BATCH_LIMIT = 50
+
+class AnalysisBatchRequest(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=ANALYSIS_BATCH_LIMIT)
+    # ETags the client already holds, by analysis ID; unchanged analyses come back as 304 without a body
+    etags: Dict[str, str] = Field(default_factory=dict)
+
 # Enhanced AI Agent Classes
 class MarketIntelligenceAgent:
     @staticmethod
@@ -630,7 +673,7 @@ class MarketIntelligenceAgent:
 
             # Call Together AI API with Kimi K2 Instruct 0905 (with 4-minute timeout for production)
             response = await asyncio.wait_for(
-                asyncio.to_thread(
+                run_ai_call(
                     together_client.chat.completions.create,
                     model="moonshotai/Kimi-K2-Instruct-0905",
                     messages=[
@@ -1071,6 +1114,50 @@ class VisualMapGenerator:
 
         return visual_map
 
+DEFAULT_DATA_SOURCES = ["Industry reports", "Market research", "Public data"]
+
+def normalize_data_sources(sources: List[Any]) -> List[str]:
+    """Flatten AI data sources (names or {"name", "url"} dicts) into source names"""
+    # The AI returns either all dicts or all strings, so probe the type once
+    # and only fall back to per-item checks for mixed lists
+    if sources and isinstance(sources[0], dict):
+        if all(type(source) is dict for source in sources):
+            return [source.get("name", str(source)) for source in sources]
+    elif all(type(source) is str for source in sources):
+        return list(sources)
+    return [
+        source.get("name", str(source)) if isinstance(source, dict) else str(source)
+        for source in sources
+    ]
+
+# Executive summary used when AI market map generation fails, filled in with
+# the MarketInput fields by name
+FALLBACK_EXECUTIVE_SUMMARY = """
+                **1. MARKETING CHALLENGE**
+                How can {product_name} increase market share by 15-25% through enhanced digital marketing campaigns and targeted advertising strategies within the next 2-3 years?
+
+                **2. MARKET CONTEXT**  
+                The {industry} marketing landscape is evolving with digital-first customer acquisition driven by {demand_driver}. {product_name} needs strategic marketing positioning to effectively reach {target_user} in an increasingly competitive advertising environment.
+
+                **3. MARKETING SUCCESS METRICS**
+                Success will be measured by brand awareness lift, lead generation improvement, customer acquisition cost reduction, campaign ROI optimization, and improved {key_metrics} through marketing initiatives.
+
+                **4. MARKETING SCOPE & FOCUS**
+                Analysis focuses on {geography} digital marketing opportunities with emphasis on paid advertising, content marketing, and social media strategies within the {industry} sector.
+
+                **5. KEY MARKETING STAKEHOLDERS**
+                Marketing team, brand managers, target customers ({target_user}), digital agencies, media partners, and competitive marketing teams.
+
+                **6. MARKETING INSIGHT SOURCES**
+                Customer research, competitive advertising intelligence, digital analytics, campaign performance data, and marketing industry benchmarks for strategic campaign development.
+
+                **MARKET SEGMENTATION INSIGHTS**
+                Geographic and demographic segmentation reveals distinct opportunities across various market segments, with particular strength in areas experiencing rapid adoption of {transaction_type} models.
+
+                **STRATEGIC RECOMMENDATIONS**
+                Key priorities include focused market entry in high-growth segments, strategic partnerships with established players, and investment in capabilities that leverage {demand_driver} trends to capture market share.
+                """.strip()
+
 class ComprehensiveAnalysisEngine:
     @staticmethod
     async def generate_market_map(market_input: MarketInput, ai_analysis: Dict[str, Any], ppc_intelligence: Dict[str, Any] = None) -> MarketMap:
@@ -1237,7 +1324,7 @@ class ComprehensiveAnalysisEngine:
                 ))
 
             return MarketMap(
-                id=str(uuid.uuid4()),
+                id=uuid7_str(),
                 market_input_id=market_input.id,
                 total_market_size=float(market_overview.get("total_market_size", 5000000000)),
                 market_growth_rate=float(market_overview.get("growth_rate", 0.08)),
@@ -1258,10 +1345,7 @@ class ComprehensiveAnalysisEngine:
                 marketing_recommendations=ai_analysis.get("marketing_recommendations", []),
                 competitive_digital_assessment=ai_analysis.get("competitive_digital_assessment", {}),
                 ppc_intelligence=ppc_intelligence or {},
-                data_sources=[
-                    source.get("name", str(source)) if isinstance(source, dict) else str(source)
-                    for source in ai_analysis.get("data_sources", ["Industry reports", "Market research", "Public data"])
-                ],
+                data_sources=normalize_data_sources(ai_analysis.get("data_sources", DEFAULT_DATA_SOURCES)),
                 confidence_level=ai_analysis.get("confidence_level", "medium"),
                 methodology=ai_analysis.get("methodology", "AI-powered analysis with market research"),
                 executive_summary=ai_analysis.get("executive_summary", "Executive summary not available"),
@@ -1277,7 +1361,7 @@ class ComprehensiveAnalysisEngine:
             analysis_perspective = "existing_brand" if has_specific_brand else "new_entrant"
             # Return basic fallback market map
             return MarketMap(
-                id=str(uuid.uuid4()),
+                id=uuid7_str(),
                 market_input_id=market_input.id,
                 total_market_size=5000000000,
                 market_growth_rate=0.08,
@@ -1298,36 +1382,210 @@ class ComprehensiveAnalysisEngine:
                 marketing_recommendations=["Invest in content marketing", "Optimize conversion funnels"],
                 competitive_digital_assessment={},
                 ppc_intelligence={},
-                executive_summary=f"""
-                **1. MARKETING CHALLENGE**
-                How can {market_input.product_name} increase market share by 15-25% through enhanced digital marketing campaigns and targeted advertising strategies within the next 2-3 years?
-
-                **2. MARKET CONTEXT**  
-                The {market_input.industry} marketing landscape is evolving with digital-first customer acquisition driven by {market_input.demand_driver}. {market_input.product_name} needs strategic marketing positioning to effectively reach {market_input.target_user} in an increasingly competitive advertising environment.
+                executive_summary=FALLBACK_EXECUTIVE_SUMMARY.format_map(market_input.dict()),
+                data_sources=["Market research", "Industry analysis"],
+                confidence_level="medium",
+                methodology="AI analysis",
+                timestamp=datetime.utcnow()
+            )
 
-                **3. MARKETING SUCCESS METRICS**
-                Success will be measured by brand awareness lift, lead generation improvement, customer acquisition cost reduction, campaign ROI optimization, and improved {market_input.key_metrics} through marketing initiatives.
+# Keywords used to infer persona demographics from legacy segment descriptions.
+# The lookahead makes findall report overlapping matches, so the result is the
+# same as testing each keyword with "in".
+PERSONA_KEYWORD_PATTERN = re.compile(
+    r"(?=(young|millennial|senior|mature|high income|affluent|executive|"
+    r"budget|cost-conscious|professional|corporate|manager))"
+)
 
-                **4. MARKETING SCOPE & FOCUS**
-                Analysis focuses on {market_input.geography} digital marketing opportunities with emphasis on paid advertising, content marketing, and social media strategies within the {market_input.industry} sector.
+# Resonate taxonomy path prefixes for demographics inferred from legacy segments
+AGE_TAXONOMY_PREFIX = "Demographics > Demographics > Identity > Age Group > "
+INCOME_TAXONOMY_PREFIX = "Demographics > Demographics > SocioEconomic > Household Income > "
+EDUCATION_TAXONOMY_PREFIX = "Demographics > Demographics > SocioEconomic > Education > "
+
+def infer_legacy_resonate_mapping(segment: Dict[str, Any], geography: str) -> Dict[str, Any]:
+    """Basic Resonate mapping for older analyses saved without enhanced persona data"""
+    # Generate basic demographic data from segment description
+    segment_desc = segment.get("description", "").lower()
+
+    # Infer basic demographics from description, collecting every
+    # keyword it mentions in a single scan
+    keywords = set(PERSONA_KEYWORD_PATTERN.findall(segment_desc))
+
+    age_range = "25-54"  # Default professional range
+    if "young" in keywords or "millennial" in keywords:
+        age_range = "25-34"
+    elif "senior" in keywords or "mature" in keywords:
+        age_range = "45-64"
+
+    income_bracket = "$50K-$100K"  # Default middle class
+    if "high income" in keywords or "affluent" in keywords or "executive" in keywords:
+        income_bracket = "$100K+"
+    elif "budget" in keywords or "cost-conscious" in keywords:
+        income_bracket = "$25K-$50K"
+
+    education = "College Graduate"
+    if "professional" in keywords or "corporate" in keywords:
+        education = "College Graduate"
+
+    employment = "Professional"
+    if "manager" in keywords or "executive" in keywords:
+        employment = "Management"
+
+    # Create basic resonate mapping for legacy data
+    return {
+        "demographics": {
+            "age_range": age_range,
+            "gender": "Mixed",
+            "household_income": income_bracket,
+            "education": education,
+            "employment": employment
+        },
+        "geographics": {
+            "region": geography,
+            "market_size": "Major Metro",
+            "geography_type": "Urban"
+        },
+        "media_usage": {
+            "primary_media": ["Digital", "Social Media"],
+            "digital_engagement": "High",
+            "content_preferences": ["Professional Content", "Industry News"]
+        },
+        "resonate_taxonomy_paths": [
+            AGE_TAXONOMY_PREFIX + age_range,
+            INCOME_TAXONOMY_PREFIX + income_bracket,
+            EDUCATION_TAXONOMY_PREFIX + education
+        ],
+        "mapping_confidence": "Medium (Inferred)"
+    }
+
+PERSONA_SEGMENT_TYPES = (
+    ("demographic", "segmentation_by_demographics"),
+    ("psychographic", "segmentation_by_psychographics"),
+    ("behavioral", "segmentation_by_behavioral")
+)
 
-                **5. KEY MARKETING STAKEHOLDERS**
-                Marketing team, brand managers, target customers ({market_input.target_user}), digital agencies, media partners, and competitive marketing teams.
+def build_persona(segment: Dict[str, Any], segment_type: str, geography: str):
+    """Build the persona export entry and Resonate taxonomy entry for a segment"""
+    resonate_mapping = segment.get("resonate_mapping") or {}
+
+    # For older analyses without enhanced data, provide basic inference
+    if segment_type == "demographic" and not (
+            resonate_mapping.get("demographics")
+            or resonate_mapping.get("geographics")
+            or resonate_mapping.get("media_usage")
+            or resonate_mapping.get("resonate_taxonomy_paths")
+            or resonate_mapping.get("mapping_confidence")):
+        resonate_mapping = infer_legacy_resonate_mapping(segment, geography)
+
+    resonate_ready_data = {
+        "demographics": resonate_mapping.get("demographics", {}),
+        "geographics": resonate_mapping.get("geographics", {}),
+        "media_usage": resonate_mapping.get("media_usage", {}),
+        "taxonomy_paths": resonate_mapping.get("resonate_taxonomy_paths", []),
+        "confidence": resonate_mapping.get("mapping_confidence", "Medium")
+    }
+    persona_data = {
+        "segment_name": segment.get("name"),
+        "description": segment.get("description"),
+        "market_size": segment.get("size_estimate", 0),
+        "growth_rate": segment.get("growth_rate", 0),
+        "resonate_ready_data": resonate_ready_data
+    }
+
+    # Extract Resonate mappings for easy integration
+    taxonomy_entry = None
+    if resonate_mapping:
+        taxonomy_entry = {
+            "segment_name": segment.get("name"),
+            "segment_type": segment_type,
+            **resonate_ready_data
+        }
+    return persona_data, taxonomy_entry
+
+# Field projections for endpoints that only read part of a stored analysis
+EXCEL_EXPORT_MAP_FIELDS = {
+    "_id": 0, "market_input_id": 1, "total_market_size": 1, "market_growth_rate": 1,
+    "timestamp": 1, "competitors": 1
+}
+EXCEL_EXPORT_INPUT_FIELDS = {"_id": 0, "geography": 1}
+PERSONA_EXPORT_MAP_FIELDS = {
+    "_id": 0, "market_input_id": 1, "total_market_size": 1, "timestamp": 1,
+    "segmentation_by_demographics": 1, "segmentation_by_psychographics": 1,
+    "segmentation_by_behavioral": 1
+}
+PERSONA_EXPORT_INPUT_FIELDS = {"_id": 0, "product_name": 1, "industry": 1, "geography": 1}
+
+# Defaults for required fields missing from market maps stored by older versions
+LEGACY_MARKET_MAP_DEFAULTS = {
+    "analysis_perspective": "new_entrant",
+    "brand_position": None,
+    "segmentation_by_firmographics": []
+}
+
+def stored_document_payload(document: Dict[str, Any], model: type,
+                            defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Validate a stored document against its model and dump it like model.dict().
+
+    Validation fills nested defaults (e.g. a segment's resonate_mapping) that
+    older documents lack, and fails loudly on documents missing required fields.
+    """
+    return model(**{**(defaults or {}), **document}).model_dump()
+
+# Visual maps are derived only from a stored (immutable) analysis, so keep the
+# most recently viewed ones instead of regenerating them on every GET
+VISUAL_MAP_CACHE_SIZE = 256
+visual_map_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+def get_visual_map(analysis_id: str, market_map: Dict[str, Any], product_name: str) -> Dict[str, Any]:
+    """Return the visual map for an analysis, generating it on a cache miss"""
+    visual_map = visual_map_cache.get(analysis_id)
+    if visual_map is not None:
+        visual_map_cache.move_to_end(analysis_id)
+        return visual_map
 
-                **6. MARKETING INSIGHT SOURCES**
-                Customer research, competitive advertising intelligence, digital analytics, campaign performance data, and marketing industry benchmarks for strategic campaign development.
+    visual_map = VisualMapGenerator.generate_visual_market_map({
+        "segmentation": {
+            "by_geographics": market_map.get("segmentation_by_geographics", []),
+            "by_demographics": market_map.get("segmentation_by_demographics", []),
+            "by_psychographics": market_map.get("segmentation_by_psychographics", []),
+            "by_behavioral": market_map.get("segmentation_by_behavioral", []),
+            "by_firmographics": market_map.get("segmentation_by_firmographics", [])
+        }
+    }, product_name)
+
+    visual_map_cache[analysis_id] = visual_map
+    if len(visual_map_cache) > VISUAL_MAP_CACHE_SIZE:
+        visual_map_cache.popitem(last=False)
+    return visual_map
+
+async def fetch_analysis_documents(analysis_id: str, map_fields: Optional[Dict[str, int]] = None,
+                                   input_fields: Optional[Dict[str, int]] = None):
+    """Fetch a market map and its market input in a single round-trip via $lookup"""
+    pipeline = [
+        {"$match": {"id": analysis_id}},
+        {"$limit": 1},
+        {"$lookup": {
+            "from": "market_inputs",
+            "localField": "market_input_id",
+            "foreignField": "id",
+            "as": "market_input"
+        }}
+    ]
+    if map_fields or input_fields:
+        projection = dict(map_fields or {})
+        if input_fields:
+            projection.update({f"market_input.{field}": value for field, value in input_fields.items()})
+        else:
+            projection["market_input"] = 1
+        pipeline.append({"$project": projection})
 
-                **MARKET SEGMENTATION INSIGHTS**
-                Geographic and demographic segmentation reveals distinct opportunities across various market segments, with particular strength in areas experiencing rapid adoption of {market_input.transaction_type} models.
+    documents = await db.market_maps.aggregate(pipeline).to_list(1)
+    if not documents:
+        return None, None
 
-                **STRATEGIC RECOMMENDATIONS**
-                Key priorities include focused market entry in high-growth segments, strategic partnerships with established players, and investment in capabilities that leverage {market_input.demand_driver} trends to capture market share.
-                """.strip(),
-                data_sources=["Market research", "Industry analysis"],
-                confidence_level="medium",
-                methodology="AI analysis",
-                timestamp=datetime.utcnow()
-            )
+    market_map = documents[0]
+    market_inputs = market_map.pop("market_input", None) or [None]
+    return market_map, market_inputs[0]
 
 # API Routes
 @api_router.get("/")
@@ -1339,19 +1597,26 @@ async def analyze_market(market_input: MarketInput, user: User = Depends(require
     try:
         logger.info(f"Starting market analysis for: {market_input.product_name}")
         
-        # Step 1: Comprehensive AI Market Intelligence
+        # Step 1 + 1.5: AI Market Intelligence and PPC Competitive Intelligence
+        # are independent, so run them concurrently
         logger.info("Step 1: Starting AI market intelligence analysis...")
-        ai_analysis = await MarketIntelligenceAgent.analyze_market_landscape(market_input)
+        logger.info("Step 1.5: Starting PPC competitive intelligence analysis...")
+        # Extract domain from product name for PPC analysis
+        target_domain = extract_domain_from_company(market_input.product_name)
+        ai_analysis, ppc_report = await asyncio.gather(
+            MarketIntelligenceAgent.analyze_market_landscape(market_input),
+            spyfu_service.generate_ppc_intelligence_report(target_domain),
+            return_exceptions=True
+        )
+        if isinstance(ai_analysis, BaseException):
+            raise ai_analysis
         logger.info("Step 1: AI analysis completed successfully")
 
-        # Step 1.5: PPC Competitive Intelligence
-        logger.info("Step 1.5: Starting PPC competitive intelligence analysis...")
         ppc_intelligence = {}
         try:
-            # Extract domain from product name for PPC analysis
-            target_domain = extract_domain_from_company(market_input.product_name)
-            ppc_report = await spyfu_service.generate_ppc_intelligence_report(target_domain)
-            
+            if isinstance(ppc_report, BaseException):
+                raise ppc_report
+
             ppc_intelligence = {
                 "target_domain": ppc_report.target_domain,
                 "paid_keywords_count": len(ppc_report.paid_keywords),
@@ -1400,19 +1665,27 @@ async def analyze_market(market_input: MarketInput, user: User = Depends(require
 
         # Step 4: Save to database
         logger.info("Step 4: Saving data to database...")
-        await db.market_inputs.insert_one(market_input.dict())
-        logger.info("Step 4a: Market input saved to database")
-        
-        await db.market_maps.insert_one(market_map.dict())
-        logger.info("Step 4b: Market map saved to database")
+        # Serialize each model once; the same dicts back the database
+        # documents and the response below
+        market_input_doc = market_input.dict()
+        market_map_doc = market_map.dict()
+
+        # The two documents are independent, so write them concurrently. The
+        # visual map is stored with the market map so reads don't regenerate it
+        await asyncio.gather(
+            db.market_inputs.insert_one(market_input_doc),
+            db.market_maps.insert_one({**market_map_doc, "_visual_map": visual_map})
+        )
+        logger.info("Step 4: Market input and market map saved to database")
 
-        # Step 5: Generate final analysis
+        # Step 5: Generate final analysis (Mongo's "_id" added by insert_one
+        # is dropped when FastAPI validates against MarketAnalysis)
         logger.info("Step 5: Generating final analysis response...")
-        analysis = MarketAnalysis(
-            market_input=market_input,
-            market_map=market_map,
-            visual_map=visual_map
-        )
+        analysis = {
+            "market_input": market_input_doc,
+            "market_map": market_map_doc,
+            "visual_map": visual_map
+        }
         logger.info("Step 5: Final analysis generated successfully")
 
         logger.info(f"Market analysis completed successfully for: {market_input.product_name}")
@@ -1427,46 +1700,46 @@ async def analyze_market(market_input: MarketInput, user: User = Depends(require
 async def export_market_map(analysis_id: str):
     try:
         # Get analysis from database
-        market_map = await db.market_maps.find_one({"id": analysis_id})
+        market_map, market_input = await fetch_analysis_documents(
+            analysis_id, EXCEL_EXPORT_MAP_FIELDS, EXCEL_EXPORT_INPUT_FIELDS
+        )
         if not market_map:
             raise HTTPException(status_code=404, detail="Market map not found")
 
-        market_input = await db.market_inputs.find_one({"id": market_map["market_input_id"]})
         if not market_input:
             raise HTTPException(status_code=404, detail="Market input not found")
 
-        # Create comprehensive Excel report
+        # openpyxl is only needed here, so keep it off the worker's import path
+        from openpyxl import Workbook
+
+        # Create comprehensive Excel report, streaming rows straight into a
+        # write-only workbook instead of building intermediate DataFrames
         output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Market Overview Sheet
-            overview_data = {
-                "Metric": ["Total Market Size", "Growth Rate", "Geography", "Analysis Date"],
-                "Value": [
-                    f"${market_map['total_market_size']/1000000000:.1f}B",
-                    f"{market_map['market_growth_rate']*100:.1f}%",
-                    market_input["geography"],
-                    str(market_map["timestamp"])  # Convert datetime to string
-                ]
-            }
-            overview_df = pd.DataFrame(overview_data)
-            overview_df.to_excel(writer, sheet_name='Market Overview', index=False)
-
-            # Competitive Analysis Sheet
-            if market_map["competitors"]:
-                comp_data = []
-                for comp in market_map["competitors"]:
-                    comp_data.append({
-                        "Competitor": comp["name"],
-                        "Market Share": f"{comp.get('market_share', 0)*100:.1f}%" if comp.get('market_share') else "N/A",
-                        "Strengths": "; ".join(comp["strengths"]),
-                        "Weaknesses": "; ".join(comp["weaknesses"]),
-                        "Price Range": comp.get("price_range", "N/A")
-                    })
-                comp_df = pd.DataFrame(comp_data)
-                comp_df.to_excel(writer, sheet_name='Competitive Analysis', index=False)
+        workbook = Workbook(write_only=True)
+
+        # Market Overview Sheet
+        overview_sheet = workbook.create_sheet("Market Overview")
+        overview_sheet.append(["Metric", "Value"])
+        overview_sheet.append(["Total Market Size", f"${market_map['total_market_size']/1000000000:.1f}B"])
+        overview_sheet.append(["Growth Rate", f"{market_map['market_growth_rate']*100:.1f}%"])
+        overview_sheet.append(["Geography", market_input["geography"]])
+        overview_sheet.append(["Analysis Date", str(market_map["timestamp"])])  # Convert datetime to string
+
+        # Competitive Analysis Sheet
+        if market_map["competitors"]:
+            comp_sheet = workbook.create_sheet("Competitive Analysis")
+            comp_sheet.append(["Competitor", "Market Share", "Strengths", "Weaknesses", "Price Range"])
+            for comp in market_map["competitors"]:
+                comp_sheet.append([
+                    comp["name"],
+                    f"{comp.get('market_share', 0)*100:.1f}%" if comp.get('market_share') else "N/A",
+                    "; ".join(comp["strengths"]),
+                    "; ".join(comp["weaknesses"]),
+                    comp.get("price_range", "N/A")
+                ])
 
         # Save the workbook and get the bytes
-        output.seek(0)
+        workbook.save(output)
         excel_data = output.getvalue()
 
         # Return as streaming response
@@ -1474,7 +1747,7 @@ async def export_market_map(analysis_id: str):
             io.BytesIO(excel_data),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={
-                "Content-Disposition": f"attachment; filename=Market_Map_{analysis_id[:8]}.xlsx",
+                "Content-Disposition": f"attachment; filename=Market_Map_{analysis_id[-8:]}.xlsx",
                 "Content-Length": str(len(excel_data))
             }
         )
@@ -1488,23 +1761,24 @@ async def export_pdf(analysis_id: str):
     """Export market analysis as professional PDF matching web design"""
     try:
         # Get analysis from database
-        market_map = await db.market_maps.find_one({"id": analysis_id})
+        market_map, market_input = await fetch_analysis_documents(analysis_id)
         if not market_map:
             raise HTTPException(status_code=404, detail="Market map not found")
 
-        market_input = await db.market_inputs.find_one({"id": market_map["market_input_id"]})
         if not market_input:
             raise HTTPException(status_code=404, detail="Market input not found")
         
-        # Generate PDF using new generator
-        pdf_data = create_market_report_pdf(market_map, market_input)
+        # Generate PDF using new generator (reportlab is imported lazily)
+        from pdf_generator import create_market_report_pdf
+        pdf_buffer = create_market_report_pdf(market_map, market_input, io.BytesIO())
         
-        # Return PDF
-        return Response(
-            content=pdf_data,
+        # Stream the PDF straight from the buffer instead of copying it to bytes
+        return StreamingResponse(
+            pdf_buffer,
             media_type="application/pdf",
             headers={
-                "Content-Disposition": f"attachment; filename=BCM_Market_Report_{market_input['product_name'].replace(' ', '_')}.pdf"
+                "Content-Disposition": f"attachment; filename=BCM_Market_Report_{market_input['product_name'].replace(' ', '_')}.pdf",
+                "Content-Length": str(pdf_buffer.getbuffer().nbytes)
             }
         )
         
@@ -1512,49 +1786,52 @@ async def export_pdf(analysis_id: str):
         logging.error(f"Error in export_pdf: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/analysis/{analysis_id}")
-async def get_analysis(analysis_id: str):
-    try:
-        # Get market map from database
-        market_map = await db.market_maps.find_one({"id": analysis_id})
-        if not market_map:
-            raise HTTPException(status_code=404, detail="Analysis not found")
+async def load_analysis(analysis_id: str) -> Dict[str, Any]:
+    """Load a stored analysis with its market input and visual map, raising 404 if either is missing"""
+    # Get market map from database
+    market_map, market_input = await fetch_analysis_documents(analysis_id)
+    if not market_map:
+        raise HTTPException(status_code=404, detail="Analysis not found")
 
-        market_input = await db.market_inputs.find_one({"id": market_map["market_input_id"]})
-        if not market_input:
-            raise HTTPException(status_code=404, detail="Market input not found")
+    if not market_input:
+        raise HTTPException(status_code=404, detail="Market input not found")
 
-        # Handle backward compatibility for older reports missing new fields
-        market_map_data = dict(market_map)
-        
-        # Add default values for missing fields in older reports
-        if "analysis_perspective" not in market_map_data:
-            market_map_data["analysis_perspective"] = "new_entrant"
-        if "brand_position" not in market_map_data:
-            market_map_data["brand_position"] = None
-        if "segmentation_by_firmographics" not in market_map_data:
-            market_map_data["segmentation_by_firmographics"] = []
-        
-        # Recreate analysis object
-        analysis = MarketAnalysis(
-            market_input=MarketInput(**market_input),
-            market_map=MarketMap(**market_map_data)
-        )
+    # Handle backward compatibility for older reports missing new fields
+    market_map_data = stored_document_payload(market_map, MarketMap, LEGACY_MARKET_MAP_DEFAULTS)
+    market_input_data = stored_document_payload(market_input, MarketInput)
 
-        # Generate visual map using the existing segmentation data
-        visual_map = VisualMapGenerator.generate_visual_market_map({
-            "segmentation": {
-                "by_geographics": market_map_data.get("segmentation_by_geographics", []),
-                "by_demographics": market_map_data.get("segmentation_by_demographics", []),
-                "by_psychographics": market_map_data.get("segmentation_by_psychographics", []),
-                "by_behavioral": market_map_data.get("segmentation_by_behavioral", []),
-                "by_firmographics": market_map_data.get("segmentation_by_firmographics", [])
-            }
-        }, market_input["product_name"])
+    # Use the visual map stored at creation; older reports don't have one,
+    # so build it from the existing segmentation data (cached per analysis)
+    visual_map = market_map.get("_visual_map") or get_visual_map(
+        analysis_id, market_map_data, market_input_data["product_name"]
+    )
 
-        analysis.visual_map = visual_map
+    return {
+        "market_input": market_input_data,
+        "market_map": market_map_data,
+        "visual_map": visual_map
+    }
+
+def encode_analysis(analysis: Dict[str, Any]):
+    """Encode an analysis as JSON, returning the body and its strong ETag"""
+    body = orjson.dumps(analysis, option=orjson.OPT_NON_STR_KEYS)
+    return body, f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+def etag_matches(etag: str, if_none_match: Optional[str]) -> bool:
+    """Check an ETag against an If-None-Match header"""
+    return bool(if_none_match) and (
+        if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+    )
 
-        return analysis
+@api_router.get("/analysis/{analysis_id}")
+async def get_analysis(analysis_id: str, if_none_match: Optional[str] = Header(None)):
+    try:
+        # Clients re-running against the same analyses send back the ETag
+        # they have, and get a bodyless 304 while it still matches
+        body, etag = encode_analysis(await load_analysis(analysis_id))
+        if etag_matches(etag, if_none_match):
+            return Response(status_code=304, headers={"ETag": etag})
+        return Response(body, media_type="application/json", headers={"ETag": etag})
 
     except HTTPException:
         # Re-raise HTTP exceptions
@@ -1563,16 +1840,40 @@ async def get_analysis(analysis_id: str):
         logging.error(f"Error in get_analysis: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/export-personas/{analysis_id}")
+async def load_analysis_result(analysis_id: str, known_etag: Optional[str]) -> bytes:
+    """Load and encode one analysis for a batch request, reporting failures in the result instead of raising"""
+    try:
+        body, etag = encode_analysis(await load_analysis(analysis_id))
+        if etag == known_etag:
+            return orjson.dumps({"id": analysis_id, "status": 304, "etag": etag})
+        # Splice in the body encoded for the ETag rather than encoding the analysis again
+        header = orjson.dumps({"id": analysis_id, "status": 200, "etag": etag})
+        return header[:-1] + b',"analysis":' + body + b'}'
+    except HTTPException as e:
+        return orjson.dumps({"id": analysis_id, "status": e.status_code, "detail": e.detail})
+    except Exception as e:
+        logging.error(f"Error in get_analyses_batch for {analysis_id}: {e}")
+        return orjson.dumps({"id": analysis_id, "status": 500, "detail": str(e)})
+
+@api_router.post("/analyses:batch")
+async def get_analyses_batch(batch: AnalysisBatchRequest):
+    """Load several analyses in one request; results are in request order, each with its own status"""
+    results = await asyncio.gather(*(
+        load_analysis_result(analysis_id, batch.etags.get(analysis_id)) for analysis_id in batch.ids
+    ))
+    return Response(b'{"results":[' + b','.join(results) + b']}', media_type="application/json")
+
+@api_router.get("/export-personas/{analysis_id}", response_class=ORJSONResponse)
 async def export_personas(analysis_id: str):
     """Export enhanced persona data for persona development and Resonate rAI integration"""
     try:
         # Get market map from database
-        market_map = await db.market_maps.find_one({"id": analysis_id})
+        market_map, market_input = await fetch_analysis_documents(
+            analysis_id, PERSONA_EXPORT_MAP_FIELDS, PERSONA_EXPORT_INPUT_FIELDS
+        )
         if not market_map:
             raise HTTPException(status_code=404, detail="Analysis not found")
 
-        market_input = await db.market_inputs.find_one({"id": market_map["market_input_id"]})
         if not market_input:
             raise HTTPException(status_code=404, detail="Market input not found")
 
@@ -1596,168 +1897,36 @@ async def export_personas(analysis_id: str):
             }
         }
 
-        # Process demographic segments
-        for segment in market_map.get("segmentation_by_demographics", []):
-            resonate_mapping = segment.get("resonate_mapping", {}) or {}
-            
-            # For older analyses without enhanced data, provide basic inference
-            if not resonate_mapping or not any(resonate_mapping.values()):
-                # Generate basic demographic data from segment description and name
-                segment_desc = segment.get("description", "").lower()
-                segment_name = segment.get("name", "").lower()
-                
-                # Infer basic demographics from description
-                age_range = "25-54"  # Default professional range
-                if "young" in segment_desc or "millennial" in segment_desc:
-                    age_range = "25-34"
-                elif "senior" in segment_desc or "mature" in segment_desc:
-                    age_range = "45-64"
-                
-                income_bracket = "$50K-$100K"  # Default middle class
-                if "high income" in segment_desc or "affluent" in segment_desc or "executive" in segment_desc:
-                    income_bracket = "$100K+"
-                elif "budget" in segment_desc or "cost-conscious" in segment_desc:
-                    income_bracket = "$25K-$50K"
-                
-                education = "College Graduate"
-                if "professional" in segment_desc or "corporate" in segment_desc:
-                    education = "College Graduate"
-                
-                employment = "Professional"
-                if "manager" in segment_desc or "executive" in segment_desc:
-                    employment = "Management"
-                
-                # Create basic resonate mapping for legacy data
-                resonate_mapping = {
-                    "demographics": {
-                        "age_range": age_range,
-                        "gender": "Mixed",
-                        "household_income": income_bracket,
-                        "education": education,
-                        "employment": employment
-                    },
-                    "geographics": {
-                        "region": market_input.get("geography", "United States"),
-                        "market_size": "Major Metro",
-                        "geography_type": "Urban"
-                    },
-                    "media_usage": {
-                        "primary_media": ["Digital", "Social Media"],
-                        "digital_engagement": "High",
-                        "content_preferences": ["Professional Content", "Industry News"]
-                    },
-                    "resonate_taxonomy_paths": [
-                        f"Demographics > Demographics > Identity > Age Group > {age_range}",
-                        f"Demographics > Demographics > SocioEconomic > Household Income > {income_bracket}",
-                        f"Demographics > Demographics > SocioEconomic > Education > {education}"
-                    ],
-                    "mapping_confidence": "Medium (Inferred)"
-                }
-            
-            persona_data = {
-                "segment_name": segment.get("name"),
-                "description": segment.get("description"),
-                "market_size": segment.get("size_estimate", 0),
-                "growth_rate": segment.get("growth_rate", 0),
-                "resonate_ready_data": {
-                    "demographics": resonate_mapping.get("demographics", {}),
-                    "geographics": resonate_mapping.get("geographics", {}),
-                    "media_usage": resonate_mapping.get("media_usage", {}),
-                    "taxonomy_paths": resonate_mapping.get("resonate_taxonomy_paths", []),
-                    "confidence": resonate_mapping.get("mapping_confidence", "Medium")
-                }
-            }
-            personas["demographic_personas"].append(persona_data)
-            
-            # Extract Resonate mappings for easy integration
-            if resonate_mapping:
-                personas["resonate_taxonomy_mapping"].append({
-                    "segment_name": segment.get("name"),
-                    "segment_type": "demographic", 
-                    "demographics": resonate_mapping.get("demographics", {}),
-                    "geographics": resonate_mapping.get("geographics", {}),
-                    "media_usage": resonate_mapping.get("media_usage", {}),
-                    "taxonomy_paths": resonate_mapping.get("resonate_taxonomy_paths", []),
-                    "confidence": resonate_mapping.get("mapping_confidence", "Medium")
-                })
-
-        # Process psychographic segments  
-        for segment in market_map.get("segmentation_by_psychographics", []):
-            resonate_mapping = segment.get("resonate_mapping", {})
-            persona_data = {
-                "segment_name": segment.get("name"),
-                "description": segment.get("description"), 
-                "market_size": segment.get("size_estimate", 0),
-                "growth_rate": segment.get("growth_rate", 0),
-                "resonate_ready_data": {
-                    "demographics": resonate_mapping.get("demographics", {}),
-                    "geographics": resonate_mapping.get("geographics", {}),
-                    "media_usage": resonate_mapping.get("media_usage", {}),
-                    "taxonomy_paths": resonate_mapping.get("resonate_taxonomy_paths", []),
-                    "confidence": resonate_mapping.get("mapping_confidence", "Medium")
-                }
-            }
-            personas["psychographic_personas"].append(persona_data)
-            
-            # Extract Resonate mappings
-            if resonate_mapping:
-                personas["resonate_taxonomy_mapping"].append({
-                    "segment_name": segment.get("name"),
-                    "segment_type": "psychographic", 
-                    "demographics": resonate_mapping.get("demographics", {}),
-                    "geographics": resonate_mapping.get("geographics", {}),
-                    "media_usage": resonate_mapping.get("media_usage", {}),
-                    "taxonomy_paths": resonate_mapping.get("resonate_taxonomy_paths", []),
-                    "confidence": resonate_mapping.get("mapping_confidence", "Medium")
-                })
-
-        # Process behavioral segments
-        for segment in market_map.get("segmentation_by_behavioral", []):
-            resonate_mapping = segment.get("resonate_mapping", {})
-            persona_data = {
-                "segment_name": segment.get("name"),
-                "description": segment.get("description"),
-                "market_size": segment.get("size_estimate", 0), 
-                "growth_rate": segment.get("growth_rate", 0),
-                "resonate_ready_data": {
-                    "demographics": resonate_mapping.get("demographics", {}),
-                    "geographics": resonate_mapping.get("geographics", {}),
-                    "media_usage": resonate_mapping.get("media_usage", {}),
-                    "taxonomy_paths": resonate_mapping.get("resonate_taxonomy_paths", []),
-                    "confidence": resonate_mapping.get("mapping_confidence", "Medium")
-                }
-            }
-            personas["behavioral_personas"].append(persona_data)
-            
-            # Extract Resonate mappings
-            if resonate_mapping:
-                personas["resonate_taxonomy_mapping"].append({
-                    "segment_name": segment.get("name"),
-                    "segment_type": "behavioral",
-                    "demographics": resonate_mapping.get("demographics", {}),
-                    "geographics": resonate_mapping.get("geographics", {}),
-                    "media_usage": resonate_mapping.get("media_usage", {}),
-                    "taxonomy_paths": resonate_mapping.get("resonate_taxonomy_paths", []),
-                    "confidence": resonate_mapping.get("mapping_confidence", "Medium")
-                })
+        # Process demographic, psychographic and behavioral segments
+        geography = market_input.get("geography", "United States")
+        for segment_type, segmentation_key in PERSONA_SEGMENT_TYPES:
+            results = [
+                build_persona(segment, segment_type, geography)
+                for segment in market_map.get(segmentation_key, [])
+            ]
+            personas[f"{segment_type}_personas"] = [persona_data for persona_data, _ in results]
+            personas["resonate_taxonomy_mapping"].extend(
+                taxonomy_entry for _, taxonomy_entry in results if taxonomy_entry
+            )
 
         # Calculate summary statistics
         total_segments = len(personas["demographic_personas"]) + len(personas["psychographic_personas"]) + len(personas["behavioral_personas"])
-        resonate_ready_count = sum(1 for p in personas["demographic_personas"] + personas["psychographic_personas"] + personas["behavioral_personas"] if p.get("resonate_ready_data"))
-        
-        # Collect unique taxonomy categories
-        all_taxonomy_paths = []
-        for mapping in personas["resonate_taxonomy_mapping"]:
-            all_taxonomy_paths.extend(mapping.get("taxonomy_paths", []))
+        # Every persona carries a (non-empty) resonate_ready_data dict
+        resonate_ready_count = total_segments
+        total_taxonomy_mappings = sum(
+            len(mapping.get("taxonomy_paths", [])) for mapping in personas["resonate_taxonomy_mapping"]
+        )
         
         personas["persona_summary"] = {
             "total_segments": total_segments,
             "resonate_ready_segments": resonate_ready_count,
-            "total_taxonomy_mappings": len(all_taxonomy_paths),
+            "total_taxonomy_mappings": total_taxonomy_mappings,
             "resonate_integration_ready": resonate_ready_count > 0
         }
 
-        return personas
+        # Returned as a response so orjson encodes it directly, skipping
+        # FastAPI's jsonable_encoder pass
+        return ORJSONResponse(personas)
 
     except HTTPException:
         raise
@@ -1765,64 +1934,99 @@ async def export_personas(analysis_id: str):
         logging.error(f"Error in export_personas: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.get("/analysis-history")
+@api_router.get("/analysis-history", response_class=ORJSONResponse)
 async def get_analysis_history():
     try:
-        # Get recent analyses
-        results = await db.market_maps.find().sort("timestamp", -1).limit(10).to_list(10)
+        # Get recent analyses joined with their market inputs in one query;
+        # $unwind drops analyses whose market input is missing
+        results = await db.market_maps.aggregate([
+            {"$sort": {"timestamp": -1}},
+            {"$limit": 10},
+            {"$lookup": {
+                "from": "market_inputs",
+                "localField": "market_input_id",
+                "foreignField": "id",
+                "as": "market_input"
+            }},
+            {"$unwind": "$market_input"},
+            {"$project": {
+                "_id": 0,
+                "id": 1,
+                "product_name": "$market_input.product_name",
+                "geography": "$market_input.geography",
+                "market_size": "$total_market_size",
+                "confidence_level": 1,
+                "timestamp": 1
+            }}
+        ]).to_list(10)
         
-        history = []
-        for result in results:
-            market_input = await db.market_inputs.find_one({"id": result["market_input_id"]})
-            if market_input:
-                history.append({
-                    "id": result["id"],
-                    "product_name": market_input["product_name"],
-                    "geography": market_input["geography"],
-                    "market_size": result["total_market_size"],
-                    "confidence_level": result["confidence_level"],
-                    "timestamp": result["timestamp"]
-                })
+        history = [
+            {
+                "id": result["id"],
+                "product_name": result["product_name"],
+                "geography": result["geography"],
+                "market_size": result["market_size"],
+                "confidence_level": result["confidence_level"],
+                "timestamp": result["timestamp"]
+            }
+            for result in results
+        ]
 
-        return {"history": history}
+        return ORJSONResponse({"history": history})
 
     except Exception as e:
         logging.error(f"Error in get_analysis_history: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Time budgets (seconds) for the /test-integrations probes
+TOGETHER_PROBE_TIMEOUT = 5.0
+MONGO_PROBE_TIMEOUT = 2.0
+
+async def probe_together_ai() -> str:
+    """Check that the Together AI (Kimi) client answers a minimal prompt"""
+    if together_client is None:
+        return "Failed - Client not initialized"
+    try:
+        together_test = await run_ai_call(
+            together_client.chat.completions.create,
+            executor=AI_PROBE_EXECUTOR,
+            model="moonshotai/Kimi-K2-Instruct-0905",
+            messages=[{"role": "user", "content": "Say 'OK'"}],
+            max_tokens=5
+        )
+        if together_test.choices[0].message.content:
+            return "OK"
+        return "Failed - No response"
+    except Exception as e:
+        logger.error(f"Error testing Together AI: {e}")
+        return f"Failed - {str(e)}"
+
+async def probe_mongodb() -> str:
+    """Check that MongoDB accepts a write and a delete"""
+    try:
+        await db.test_collection.insert_one({"test": "data"})
+        await db.test_collection.delete_one({"test": "data"})
+        return "OK"
+    except Exception as e:
+        logger.error(f"MongoDB test failed: {e}")
+        return "Failed"
+
+async def run_integration_probe(probe, timeout: float) -> str:
+    """Run an integration probe, reporting a timeout instead of waiting on it"""
+    try:
+        return await asyncio.wait_for(probe, timeout=timeout)
+    except asyncio.TimeoutError:
+        return "Failed - Timeout"
+
 @api_router.get("/test-integrations")
 async def test_integrations():
     """Test endpoint to verify all integrations are working"""
     try:
-        # Test Together AI (Kimi)
-        together_status = "Failed"
-        try:
-            if together_client is not None:
-                # Test with a simple API call
-                together_test = await asyncio.to_thread(
-                    together_client.chat.completions.create,
-                    model="moonshotai/Kimi-K2-Instruct-0905",
-                    messages=[{"role": "user", "content": "Say 'OK'"}],
-                    max_tokens=5
-                )
-                if together_test.choices[0].message.content:
-                    together_status = "OK"
-                else:
-                    together_status = "Failed - No response"
-            else:
-                together_status = "Failed - Client not initialized"
-        except Exception as e:
-            logger.error(f"Error testing Together AI: {e}")
-            together_status = f"Failed - {str(e)}"
-
-        # Test MongoDB
-        try:
-            await db.test_collection.insert_one({"test": "data"})
-            await db.test_collection.delete_one({"test": "data"})
-            mongo_status = "OK"
-        except Exception as e:
-            logger.error(f"MongoDB test failed: {e}")
-            mongo_status = "Failed"
+        # Probe both integrations concurrently, each under a hard time budget
+        together_status, mongo_status = await asyncio.gather(
+            run_integration_probe(probe_together_ai(), TOGETHER_PROBE_TIMEOUT),
+            run_integration_probe(probe_mongodb(), MONGO_PROBE_TIMEOUT)
+        )
 
         return {
             "integrations": {
@@ -1856,6 +2060,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def create_db_indexes():
+    # Every analysis lookup is by "id", so keep both collections indexed on it;
+    # the history endpoint also sorts market maps by newest first
+    try:
+        await db.market_maps.create_index("id", unique=True)
+        await db.market_inputs.create_index("id", unique=True)
+        await db.market_maps.create_index([("timestamp", -1)])
+    except Exception as e:
+        logger.error(f"Failed to create database indexes: {e}")
+    # Let MongoDB's TTL monitor delete sessions once they pass expires_at (lookups
+    # already ignore expired ones). Kept separate so an existing expires_at index
+    # with other options is logged without skipping the indexes above
+    try:
+        await db.sessions.create_index("expires_at", expireAfterSeconds=0, name="sessions_ttl")
+    except Exception as e:
+        logger.error(f"Failed to create sessions TTL index: {e}")
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     mongo_client.close()
+    await spyfu_service.aclose()
+    AI_EXECUTOR.shutdown(wait=False, cancel_futures=True)
+    AI_PROBE_EXECUTOR.shutdown(wait=False, cancel_futures=True)
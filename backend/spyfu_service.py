@@ -4,61 +4,185 @@ Provides methods to retrieve competitor PPC data, keywords, and ad intelligence
 """
 
 import os
-import asyncio
-import base64
+import re
+import importlib.util
 import logging
-from typing import Dict, List, Optional, Any
-from urllib.parse import urlencode
+import time
+from functools import lru_cache
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Any, Tuple
 import httpx
-from pydantic import BaseModel, Field
+import orjson
+from tenacity import (
+    retry, retry_if_exception_type, retry_if_not_exception_type,
+    stop_after_attempt, stop_after_delay, wait_exponential, wait_random
+)
+from pydantic import BaseModel, Field, ConfigDict, TypeAdapter
 
 logger = logging.getLogger(__name__)
 
 # Data Models for SpyFu API Responses
+# Validation aliases map SpyFu's response field names onto the model fields,
+# so API rows can be validated directly; the models can still be built by
+# field name.
 class PPCKeyword(BaseModel):
     """PPC Keyword data from SpyFu API"""
-    keyword: str
+    model_config = ConfigDict(populate_by_name=True)
+
+    keyword: str = ""
     monthly_searches: Optional[int] = 0
     cpc: Optional[float] = 0.0
     competition: Optional[str] = "Unknown"
     position: Optional[int] = None
-    estimated_monthly_cost: Optional[float] = 0.0
+    estimated_monthly_cost: Optional[float] = Field(0.0, validation_alias="estimated_cost")
 
 class PPCCompetitor(BaseModel):
     """PPC Competitor data from SpyFu API"""
-    domain: str
+    model_config = ConfigDict(populate_by_name=True)
+
+    domain: str = ""
     overlapping_keywords: Optional[int] = 0
-    estimated_monthly_spend: Optional[float] = 0.0
-    shared_keywords_count: Optional[int] = 0
+    estimated_monthly_spend: Optional[float] = Field(0.0, validation_alias="estimated_spend")
+    shared_keywords_count: Optional[int] = Field(0, validation_alias="shared_keywords")
 
 class AdHistoryEntry(BaseModel):
     """Ad History entry from SpyFu API"""
-    ad_text: str
-    keyword: str
+    ad_text: str = ""
+    keyword: str = ""
     first_seen: Optional[str] = None
     last_seen: Optional[str] = None
     position: Optional[int] = None
 
 class DomainStats(BaseModel):
     """Domain statistics from SpyFu API"""
+    model_config = ConfigDict(populate_by_name=True)
+
     domain: str
     organic_keywords: Optional[int] = 0
     paid_keywords: Optional[int] = 0
-    estimated_monthly_organic_traffic: Optional[int] = 0
-    estimated_monthly_paid_traffic: Optional[int] = 0
-    estimated_monthly_ad_spend: Optional[float] = 0.0
+    estimated_monthly_organic_traffic: Optional[int] = Field(0, validation_alias="organic_traffic")
+    estimated_monthly_paid_traffic: Optional[int] = Field(0, validation_alias="paid_traffic")
+    estimated_monthly_ad_spend: Optional[float] = Field(0.0, validation_alias="estimated_spend")
 
 class PPCIntelligenceReport(BaseModel):
     """Complete PPC Intelligence Report"""
     target_domain: str
-    paid_keywords: List[PPCKeyword] = []
-    top_competitors: List[PPCCompetitor] = []
-    ad_history: List[AdHistoryEntry] = []
+    paid_keywords: List[PPCKeyword] = Field(default_factory=list)
+    top_competitors: List[PPCCompetitor] = Field(default_factory=list)
+    ad_history: List[AdHistoryEntry] = Field(default_factory=list)
     domain_stats: Optional[DomainStats] = None
     confidence_level: str = "Medium"
 
+# httpx only speaks HTTP/2 with the optional h2 package installed; without it
+# the client stays on HTTP/1.1 rather than failing to start
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+# Scheme, leading "www." and any path are stripped from report domains in one match
+DOMAIN_CLEANUP_PATTERN = re.compile(r"^(?:https?://)?(?:www\.)?([^/]*)")
+
+# Demo PPC data templates. Event/rental domains get fixed industry examples;
+# other domains get generic examples built from the domain's base name.
+EVENT_DEMO_KEYWORDS = (
+    ("event rentals", 5400, 2.45, "Medium"),
+    ("party equipment rental", 1200, 3.20, "High"),
+    ("wedding rentals", 3600, 4.15, "High"),
+    ("tent rental near me", 2200, 2.80, "Medium"),
+    ("corporate event planning", 1800, 5.30, "High"),
+    ("event supplies rental", 900, 2.10, "Low"),
+    ("party tent rental", 1500, 3.45, "Medium"),
+    ("event equipment rental", 800, 2.95, "Medium")
+)
+
+EVENT_DEMO_COMPETITORS = (
+    ("partyrentals.com", 45, 12500),
+    ("eventnetwork.com", 38, 8900),
+    ("aaaeventrental.com", 32, 15200),
+    ("partypro.com", 28, 7800),
+    ("rentalequipment.com", 25, 9400)
+)
+
+EVENT_DEMO_ADS = (
+    ("Premium Event Rentals - Free Delivery & Setup. Quality Equipment for Memorable Events!", "event rentals"),
+    ("Wedding Tent Rentals - Beautiful, Weather-Proof Tents. Book Your Dream Wedding Today!", "wedding tent rental"),
+    ("Corporate Event Planning - Full Service Event Management. Call for Free Quote!", "corporate events"),
+    ("Party Equipment Rental - Tables, Chairs, Linens & More. Same-Day Delivery Available!", "party rentals")
+)
+
+def is_event_domain(domain: str) -> bool:
+    """Whether a domain gets the event/rental demo templates"""
+    domain_lower = domain.lower()
+    return 'event' in domain_lower or 'rental' in domain_lower
+
+@lru_cache(maxsize=256)
+def generic_demo_keyword_specs(base_name: str) -> Tuple[Tuple[str, int, float, str], ...]:
+    """(keyword, monthly searches, cpc, competition) demo rows for a generic domain"""
+    return (
+        (f"{base_name} services", 2400, 3.25, "Medium"),
+        (f"best {base_name}", 1800, 2.90, "High"),
+        (f"{base_name} near me", 3200, 2.15, "Low"),
+        (f"professional {base_name}", 1100, 4.20, "High"),
+        (f"affordable {base_name}", 950, 2.80, "Medium")
+    )
+
+@lru_cache(maxsize=256)
+def generic_demo_competitor_specs(base_name: str) -> Tuple[Tuple[str, int, int], ...]:
+    """(domain, overlapping keywords, monthly spend) demo rows for a generic domain"""
+    return (
+        (f"{base_name}pro.com", 35, 8500),
+        (f"best{base_name}.com", 28, 6200),
+        (f"{base_name}services.net", 22, 4800),
+        (f"elite{base_name}.com", 18, 7100)
+    )
+
+@lru_cache(maxsize=256)
+def generic_demo_ad_specs(base_name: str) -> Tuple[Tuple[str, str], ...]:
+    """(ad text, keyword) demo rows for a generic domain"""
+    title = base_name.title()
+    return (
+        (f"{title} Services - Professional & Reliable. Get Your Free Estimate Today!", f"{title.lower()} services"),
+        (f"Best {title} in Town - 5-Star Reviews. Call Now for Special Pricing!", f"best {title.lower()}"),
+        (f"Affordable {title} Solutions - Quality Work, Fair Prices. Book Online!", f"affordable {title.lower()}")
+    )
+
+# Validate whole result lists in one pass rather than building models per row
+PPC_KEYWORDS_ADAPTER = TypeAdapter(List[PPCKeyword])
+PPC_COMPETITORS_ADAPTER = TypeAdapter(List[PPCCompetitor])
+AD_HISTORY_ADAPTER = TypeAdapter(List[AdHistoryEntry])
+
+# Parsers turning a decoded SpyFu response into models, one per endpoint
+def parse_ppc_keywords(data: Dict[str, Any], domain: str) -> List[PPCKeyword]:
+    return PPC_KEYWORDS_ADAPTER.validate_python(data.get('results', []))
+
+def parse_ppc_competitors(data: Dict[str, Any], domain: str) -> List[PPCCompetitor]:
+    return PPC_COMPETITORS_ADAPTER.validate_python(data.get('results', []))
+
+def parse_ad_history(data: Dict[str, Any], domain: str) -> List[AdHistoryEntry]:
+    return AD_HISTORY_ADAPTER.validate_python(data.get('results', []))
+
+def parse_domain_stats(data: Dict[str, Any], domain: str) -> DomainStats:
+    return DomainStats.model_validate({**data, "domain": domain})
+
 class SpyFuService:
     """Service class for SpyFu API integration"""
+
+    # Endpoint paths, relative to base_url
+    PPC_KEYWORDS_PATH = "/kombat_api/competing_ppc_keywords"
+    PPC_COMPETITORS_PATH = "/paid_serp_api/paid_serps"
+    AD_HISTORY_PATH = "/ad_history_api/domain_ad_history"
+    DOMAIN_STATS_PATH = "/organic_serp_api/serp_analysis_keywords"
+
+    # Reports per domain are reused for an hour so re-running an analysis
+    # doesn't spend API quota on data that hasn't changed
+    REPORT_CACHE_TTL = 3600
+    REPORT_CACHE_SIZE = 512
+
+    # Demo report templates kept, one per event/generic template family
+    DEMO_TEMPLATE_CACHE_SIZE = 1024
+
+    # After this many consecutive failed API calls, skip SpyFu entirely for
+    # the cool-down period instead of paying a timeout on every call
+    CIRCUIT_FAILURE_THRESHOLD = 5
+    CIRCUIT_COOLDOWN = 60.0
     
     def __init__(self):
         self.api_key = os.environ.get('SPYFU_API_KEY')
@@ -70,372 +194,327 @@ class SpyFuService:
         else:
             self.available = True
             
-        # SpyFu uses API key as query parameter, no auth header needed
-        self.auth_header = {}
+
+        # Circuit breaker state
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+
+        # clean domain -> (expiry time, report), least recently used first
+        self._report_cache: "OrderedDict[str, Tuple[float, PPCIntelligenceReport]]" = OrderedDict()
+
+        # Demo template key (None for event/rental domains, else the domain's
+        # base name) -> demo report, least recently used first
+        self._demo_templates: "OrderedDict[Optional[str], PPCIntelligenceReport]" = OrderedDict()
+
+        # Shared HTTP client, created on first use (see _get_client)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Return the long-lived HTTP client, creating it on first use.
+
+        All calls share its pooled connections instead of paying a TLS
+        handshake each. When h2 is installed, HTTP/2 is offered through ALPN,
+        so the concurrent report fetches multiplex over one connection; a
+        server without HTTP/2 negotiates HTTP/1.1 instead. SpyFu takes the
+        API key as a query parameter (no auth header), so it is sent as a
+        default param.
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                params={"api_key": self.api_key} if self.api_key else None,
+                timeout=30.0,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the shared HTTP client if it was ever opened"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @retry(
+        wait=wait_exponential(multiplier=0.2, max=3) + wait_random(0, 0.2),
+        # A timed-out request already used the full 30s client timeout, so it
+        # isn't retried, and retries stop once 10s have passed
+        stop=stop_after_attempt(4) | stop_after_delay(10),
+        retry=(
+            retry_if_exception_type((httpx.TransportError, httpx.HTTPStatusError))
+            & retry_if_not_exception_type(httpx.TimeoutException)
+        ),
+        reraise=True
+    )
+    async def _get_with_retry(self, path: str, params: Dict[str, Any]) -> httpx.Response:
+        """GET a SpyFu endpoint, retrying connection errors (not timeouts) and 5xx responses"""
+        response = await self._get_client().get(path, params=params)
+        logger.debug("SpyFu %s answered %s over %s", path, response.status_code, response.http_version)
+        if response.status_code >= 500:
+            response.raise_for_status()
+        return response
+
+    def _circuit_open(self) -> bool:
+        """Whether SpyFu calls are being skipped after repeated failures"""
+        return time.monotonic() < self._circuit_open_until
+
+    def _record_success(self):
+        self._consecutive_failures = 0
+
+    def _record_failure(self):
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.CIRCUIT_FAILURE_THRESHOLD:
+            logger.warning("SpyFu API failed %d times in a row; pausing calls for %.0fs", self._consecutive_failures, self.CIRCUIT_COOLDOWN)
+            self._circuit_open_until = time.monotonic() + self.CIRCUIT_COOLDOWN
+            self._consecutive_failures = 0
     
-    async def get_ppc_keywords(self, domain: str, limit: int = 50) -> List[PPCKeyword]:
-        """Get PPC keywords for a domain"""
-        if not self.available:
-            return []
+    async def _fetch(self, path: str, domain: str, label: str, parser: Callable[[Dict[str, Any], str], Any]) -> Any:
+        """Fetch and parse one SpyFu endpoint for a domain, or None if the call failed"""
+        if not self.available or self._circuit_open():
+            return None
             
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                url = f"{self.base_url}/kombat_api/competing_ppc_keywords"
-                params = {
-                    "r": domain,  # SpyFu uses 'r' parameter for domain
-                    "api_key": self.api_key
-                }
-                
-                response = await client.get(
-                    url,
-                    params=params,
-                    headers=self.auth_header
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    keywords = []
-                    
-                    for item in data.get('results', []):
-                        keywords.append(PPCKeyword(
-                            keyword=item.get('keyword', ''),
-                            monthly_searches=item.get('monthly_searches', 0),
-                            cpc=float(item.get('cpc', 0.0)),
-                            competition=item.get('competition', 'Unknown'),
-                            position=item.get('position'),
-                            estimated_monthly_cost=float(item.get('estimated_cost', 0.0))
-                        ))
-                    
-                    logger.info(f"Retrieved {len(keywords)} PPC keywords for {domain}")
-                    return keywords
-                else:
-                    logger.warning(f"SpyFu API returned status {response.status_code} for domain {domain}")
-                    return []
+            params = {"r": domain}  # SpyFu uses 'r' parameter for domain
+            
+            response = await self._get_with_retry(path, params)
+            
+            if response.status_code == 200:
+                self._record_success()
+                return parser(orjson.loads(response.content), domain)
+            else:
+                self._record_failure()
+                logger.warning("SpyFu %s API returned status %s for %s", label, response.status_code, domain)
+                return None
                     
         except Exception as e:
-            logger.error(f"Error retrieving PPC keywords for {domain}: {e}")
+            self._record_failure()
+            logger.error("Error retrieving %s for %s: %s", label, domain, e)
+            return None
+    
+    async def get_ppc_keywords(self, domain: str, limit: int = 50) -> List[PPCKeyword]:
+        """Get PPC keywords for a domain"""
+        keywords = await self._fetch(self.PPC_KEYWORDS_PATH, domain, "PPC keywords", parse_ppc_keywords)
+        if keywords is None:
             return []
+        
+        logger.info("Retrieved %d PPC keywords for %s", len(keywords), domain)
+        return keywords
     
     async def get_ppc_competitors(self, domain: str, limit: int = 20) -> List[PPCCompetitor]:
         """Get top PPC competitors for a domain"""
-        if not self.available:
-            return []
-            
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                url = f"{self.base_url}/paid_serp_api/paid_serps"
-                params = {
-                    "r": domain,  # SpyFu uses 'r' parameter for domain
-                    "api_key": self.api_key
-                }
-                
-                response = await client.get(
-                    url,
-                    params=params,
-                    headers=self.auth_header
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    competitors = []
-                    
-                    for item in data.get('results', []):
-                        competitors.append(PPCCompetitor(
-                            domain=item.get('domain', ''),
-                            overlapping_keywords=item.get('overlapping_keywords', 0),
-                            estimated_monthly_spend=float(item.get('estimated_spend', 0.0)),
-                            shared_keywords_count=item.get('shared_keywords', 0)
-                        ))
-                    
-                    logger.info(f"Retrieved {len(competitors)} PPC competitors for {domain}")
-                    return competitors
-                else:
-                    logger.warning(f"SpyFu competitors API returned status {response.status_code}")
-                    return []
-                    
-        except Exception as e:
-            logger.error(f"Error retrieving PPC competitors for {domain}: {e}")
+        competitors = await self._fetch(self.PPC_COMPETITORS_PATH, domain, "PPC competitors", parse_ppc_competitors)
+        if competitors is None:
             return []
+        
+        logger.info("Retrieved %d PPC competitors for %s", len(competitors), domain)
+        return competitors
     
     async def get_ad_history(self, domain: str, limit: int = 25) -> List[AdHistoryEntry]:
         """Get ad history for a domain"""
-        if not self.available:
-            return []
-            
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                url = f"{self.base_url}/ad_history_api/domain_ad_history"
-                params = {
-                    "r": domain,  # SpyFu uses 'r' parameter for domain
-                    "api_key": self.api_key
-                }
-                
-                response = await client.get(
-                    url,
-                    params=params,
-                    headers=self.auth_header
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    ads = []
-                    
-                    for item in data.get('results', []):
-                        ads.append(AdHistoryEntry(
-                            ad_text=item.get('ad_text', ''),
-                            keyword=item.get('keyword', ''),
-                            first_seen=item.get('first_seen'),
-                            last_seen=item.get('last_seen'),
-                            position=item.get('position')
-                        ))
-                    
-                    logger.info(f"Retrieved {len(ads)} ad history entries for {domain}")
-                    return ads
-                else:
-                    logger.warning(f"SpyFu ad history API returned status {response.status_code}")
-                    return []
-                    
-        except Exception as e:
-            logger.error(f"Error retrieving ad history for {domain}: {e}")
+        ads = await self._fetch(self.AD_HISTORY_PATH, domain, "ad history", parse_ad_history)
+        if ads is None:
             return []
+        
+        logger.info("Retrieved %d ad history entries for %s", len(ads), domain)
+        return ads
     
     async def get_domain_stats(self, domain: str) -> Optional[DomainStats]:
         """Get comprehensive domain statistics"""
-        if not self.available:
-            return None
-            
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                url = f"{self.base_url}/organic_serp_api/serp_analysis_keywords"
-                params = {
-                    "r": domain,  # SpyFu uses 'r' parameter for domain
-                    "api_key": self.api_key
-                }
-                
-                response = await client.get(
-                    url,
-                    params=params,
-                    headers=self.auth_header
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    stats = DomainStats(
-                        domain=domain,
-                        organic_keywords=data.get('organic_keywords', 0),
-                        paid_keywords=data.get('paid_keywords', 0),
-                        estimated_monthly_organic_traffic=data.get('organic_traffic', 0),
-                        estimated_monthly_paid_traffic=data.get('paid_traffic', 0),
-                        estimated_monthly_ad_spend=float(data.get('estimated_spend', 0.0))
-                    )
-                    
-                    logger.info(f"Retrieved domain stats for {domain}")
-                    return stats
-                else:
-                    logger.warning(f"SpyFu domain stats API returned status {response.status_code}")
-                    return None
-                    
-        except Exception as e:
-            logger.error(f"Error retrieving domain stats for {domain}: {e}")
-            return None
+        stats = await self._fetch(self.DOMAIN_STATS_PATH, domain, "domain stats", parse_domain_stats)
+        if stats is not None:
+            logger.info("Retrieved domain stats for %s", domain)
+        return stats
     
     async def generate_ppc_intelligence_report(self, domain: str) -> PPCIntelligenceReport:
         """Generate comprehensive PPC intelligence report for a domain"""
-        logger.info(f"Generating PPC intelligence report for {domain}")
+        logger.info("Generating PPC intelligence report for %s", domain)
         
         # Clean domain (remove protocol, www, etc.)
-        clean_domain = domain.replace('https://', '').replace('http://', '').replace('www.', '').split('/')[0]
+        clean_domain = DOMAIN_CLEANUP_PATTERN.match(domain).group(1)
+        
+        cached = self._report_cache.get(clean_domain)
+        if cached and cached[0] > time.monotonic():
+            self._report_cache.move_to_end(clean_domain)
+            logger.info("Using cached PPC intelligence report for %s", clean_domain)
+            return cached[1]
         
         # For now, generate realistic demo data while SpyFu API access is being configured
         # This shows the user what PPC intelligence will look like
-        logger.info(f"Generating demo PPC intelligence data for {clean_domain}")
+        logger.info("Generating demo PPC intelligence data for %s", clean_domain)
+        
+        # Demo rows only depend on the domain's template family, so the report
+        # is a shallow copy of a shared template with the domain filled in
+        template = self._demo_report_template(clean_domain)
+        report = template.model_copy(update={
+            "target_domain": clean_domain,
+            "domain_stats": template.domain_stats.model_copy(update={"domain": clean_domain})
+        })
         
-        # Generate realistic demo keywords based on domain
-        demo_keywords = self._generate_demo_keywords(clean_domain)
-        demo_competitors = self._generate_demo_competitors(clean_domain)
-        demo_ads = self._generate_demo_ads(clean_domain)
-        demo_stats = self._generate_demo_stats(clean_domain)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Demo PPC intelligence report generated for %s: %d keywords, %d competitors", clean_domain, len(report.paid_keywords), len(report.top_competitors))
+        self._cache_report(clean_domain, report)
+        return report
+
+    def _cache_report(self, clean_domain: str, report: PPCIntelligenceReport):
+        """Store a report in the per-domain cache, evicting the least recently used entry when full"""
+        self._report_cache[clean_domain] = (time.monotonic() + self.REPORT_CACHE_TTL, report)
+        self._report_cache.move_to_end(clean_domain)
+        if len(self._report_cache) > self.REPORT_CACHE_SIZE:
+            self._report_cache.popitem(last=False)
+    
+    def _demo_report_template(self, clean_domain: str) -> PPCIntelligenceReport:
+        """Return the cached demo report for a domain's template family.
+
+        Event/rental domains all share one template; other domains share one
+        per base name, since that is all the generic rows are built from.
+        """
+        key = None if is_event_domain(clean_domain) else clean_domain.split('.')[0]
+        template = self._demo_templates.get(key)
+        if template is not None:
+            self._demo_templates.move_to_end(key)
+            return template
         
-        report = PPCIntelligenceReport(
+        template = PPCIntelligenceReport.model_construct(
             target_domain=clean_domain,
-            paid_keywords=demo_keywords,
-            top_competitors=demo_competitors,
-            ad_history=demo_ads,
-            domain_stats=demo_stats,
+            paid_keywords=self._generate_demo_keywords(clean_domain),
+            top_competitors=self._generate_demo_competitors(clean_domain),
+            ad_history=self._generate_demo_ads(clean_domain),
+            domain_stats=self._generate_demo_stats(clean_domain),
             confidence_level="Demo Data - SpyFu Integration Pending"
         )
-        
-        logger.info(f"Demo PPC intelligence report generated for {clean_domain}: {len(demo_keywords)} keywords, {len(demo_competitors)} competitors")
-        return report
+        self._demo_templates[key] = template
+        if len(self._demo_templates) > self.DEMO_TEMPLATE_CACHE_SIZE:
+            self._demo_templates.popitem(last=False)
+        return template
     
+    # Demo rows come from the fixed templates above, already in the right
+    # types, so the models are built without running validation.
     def _generate_demo_keywords(self, domain: str) -> List[PPCKeyword]:
         """Generate realistic demo PPC keywords"""
         # Extract business type from domain for relevant keywords
-        domain_lower = domain.lower()
-        
-        if 'event' in domain_lower or 'rental' in domain_lower:
-            base_keywords = [
-                ("event rentals", 5400, 2.45, "Medium"),
-                ("party equipment rental", 1200, 3.20, "High"),
-                ("wedding rentals", 3600, 4.15, "High"),
-                ("tent rental near me", 2200, 2.80, "Medium"),
-                ("corporate event planning", 1800, 5.30, "High"),
-                ("event supplies rental", 900, 2.10, "Low"),
-                ("party tent rental", 1500, 3.45, "Medium"),
-                ("event equipment rental", 800, 2.95, "Medium")
-            ]
+        if is_event_domain(domain):
+            base_keywords = EVENT_DEMO_KEYWORDS
         else:
             # Generic business keywords
-            base_keywords = [
-                (f"{domain.split('.')[0]} services", 2400, 3.25, "Medium"),
-                (f"best {domain.split('.')[0]}", 1800, 2.90, "High"),
-                (f"{domain.split('.')[0]} near me", 3200, 2.15, "Low"),
-                (f"professional {domain.split('.')[0]}", 1100, 4.20, "High"),
-                (f"affordable {domain.split('.')[0]}", 950, 2.80, "Medium")
-            ]
+            base_keywords = generic_demo_keyword_specs(domain.split('.')[0])
         
-        keywords = []
-        for i, (keyword, searches, cpc, comp) in enumerate(base_keywords):
-            estimated_cost = searches * cpc * 0.3  # Rough estimate
-            keywords.append(PPCKeyword(
+        return [
+            PPCKeyword.model_construct(
                 keyword=keyword,
                 monthly_searches=searches,
                 cpc=cpc,
                 competition=comp,
                 position=i + 1,
-                estimated_monthly_cost=estimated_cost
-            ))
-        
-        return keywords
+                estimated_monthly_cost=searches * cpc * 0.3  # Rough estimate
+            )
+            for i, (keyword, searches, cpc, comp) in enumerate(base_keywords)
+        ]
     
     def _generate_demo_competitors(self, domain: str) -> List[PPCCompetitor]:
         """Generate realistic demo PPC competitors"""
-        domain_lower = domain.lower()
-        
-        if 'event' in domain_lower or 'rental' in domain_lower:
-            competitor_domains = [
-                ("partyrentals.com", 45, 12500),
-                ("eventnetwork.com", 38, 8900),
-                ("aaaeventrental.com", 32, 15200),
-                ("partypro.com", 28, 7800),
-                ("rentalequipment.com", 25, 9400)
-            ]
+        if is_event_domain(domain):
+            competitor_domains = EVENT_DEMO_COMPETITORS
         else:
             # Generic competitors based on domain name
-            base_name = domain.split('.')[0]
-            competitor_domains = [
-                (f"{base_name}pro.com", 35, 8500),
-                (f"best{base_name}.com", 28, 6200),
-                (f"{base_name}services.net", 22, 4800),
-                (f"elite{base_name}.com", 18, 7100)
-            ]
+            competitor_domains = generic_demo_competitor_specs(domain.split('.')[0])
         
-        competitors = []
-        for domain_name, keywords, spend in competitor_domains:
-            competitors.append(PPCCompetitor(
+        return [
+            PPCCompetitor.model_construct(
                 domain=domain_name,
                 overlapping_keywords=keywords,
-                estimated_monthly_spend=spend,
+                estimated_monthly_spend=float(spend),
                 shared_keywords_count=keywords
-            ))
-        
-        return competitors
+            )
+            for domain_name, keywords, spend in competitor_domains
+        ]
     
     def _generate_demo_ads(self, domain: str) -> List[AdHistoryEntry]:
         """Generate realistic demo ad examples"""
-        domain_lower = domain.lower()
-        
-        if 'event' in domain_lower or 'rental' in domain_lower:
-            ad_examples = [
-                ("Premium Event Rentals - Free Delivery & Setup. Quality Equipment for Memorable Events!", "event rentals"),
-                ("Wedding Tent Rentals - Beautiful, Weather-Proof Tents. Book Your Dream Wedding Today!", "wedding tent rental"),
-                ("Corporate Event Planning - Full Service Event Management. Call for Free Quote!", "corporate events"),
-                ("Party Equipment Rental - Tables, Chairs, Linens & More. Same-Day Delivery Available!", "party rentals")
-            ]
+        if is_event_domain(domain):
+            ad_examples = EVENT_DEMO_ADS
         else:
-            base_name = domain.split('.')[0].title()
-            ad_examples = [
-                (f"{base_name} Services - Professional & Reliable. Get Your Free Estimate Today!", f"{base_name.lower()} services"),
-                (f"Best {base_name} in Town - 5-Star Reviews. Call Now for Special Pricing!", f"best {base_name.lower()}"),
-                (f"Affordable {base_name} Solutions - Quality Work, Fair Prices. Book Online!", f"affordable {base_name.lower()}")
-            ]
+            ad_examples = generic_demo_ad_specs(domain.split('.')[0])
         
-        ads = []
-        for i, (ad_text, keyword) in enumerate(ad_examples):
-            ads.append(AdHistoryEntry(
+        return [
+            AdHistoryEntry.model_construct(
                 ad_text=ad_text,
                 keyword=keyword,
                 position=i + 1
-            ))
-        
-        return ads
+            )
+            for i, (ad_text, keyword) in enumerate(ad_examples)
+        ]
     
     def _generate_demo_stats(self, domain: str) -> DomainStats:
         """Generate realistic demo domain statistics"""
-        return DomainStats(
+        return DomainStats.model_construct(
             domain=domain,
             organic_keywords=1250,
             paid_keywords=185,
             estimated_monthly_organic_traffic=8400,
             estimated_monthly_paid_traffic=2100,
-            estimated_monthly_ad_spend=15800
+            estimated_monthly_ad_spend=15800.0
         )
 
 # Global service instance
 spyfu_service = SpyFuService()
 
-# Helper function to extract domain from company name
+# Common company name -> domain mappings
+DOMAIN_MAPPINGS = {
+    'apple': 'apple.com',
+    'google': 'google.com',
+    'microsoft': 'microsoft.com',
+    'amazon': 'amazon.com',
+    'facebook': 'facebook.com',
+    'meta': 'facebook.com',
+    'netflix': 'netflix.com',
+    'spotify': 'spotify.com',
+    'uber': 'uber.com',
+    'airbnb': 'airbnb.com',
+    'paypal': 'paypal.com',
+    'stripe': 'stripe.com',
+    'salesforce': 'salesforce.com',
+    'slack': 'slack.com',
+    'shopify': 'shopify.com',
+    'starbucks': 'starbucks.com',
+    'mcdonalds': 'mcdonalds.com',
+    'coca cola': 'coca-cola.com',
+    'pepsi': 'pepsi.com',
+    'nike': 'nike.com',
+    'adidas': 'adidas.com',
+    'walmart': 'walmart.com',
+    'target': 'target.com',
+    'home depot': 'homedepot.com',
+    'best buy': 'bestbuy.com'
+}
+
+# Words dropped when building a fallback domain from a company name
+COMPANY_NAME_STOPWORDS = frozenset(['inc', 'corp', 'corporation', 'company', 'ltd', 'llc', 'the', 'and', '&'])
+
+# Helper function to extract domain from company name. Analyses resolve the same
+# names repeatedly, so results are memoized (extract_domain_from_company.cache_clear()
+# resets them).
+@lru_cache(maxsize=4096)
 def extract_domain_from_company(company_name: str) -> str:
     """Extract likely domain from company name for SpyFu analysis"""
     # Basic domain extraction - can be enhanced
     clean_name = company_name.lower().strip()
     
-    # Common mappings
-    domain_mappings = {
-        'apple': 'apple.com',
-        'google': 'google.com',
-        'microsoft': 'microsoft.com',
-        'amazon': 'amazon.com',
-        'facebook': 'facebook.com',
-        'meta': 'facebook.com',
-        'netflix': 'netflix.com',
-        'spotify': 'spotify.com',
-        'uber': 'uber.com',
-        'airbnb': 'airbnb.com',
-        'paypal': 'paypal.com',
-        'stripe': 'stripe.com',
-        'salesforce': 'salesforce.com',
-        'slack': 'slack.com',
-        'shopify': 'shopify.com',
-        'starbucks': 'starbucks.com',
-        'mcdonalds': 'mcdonalds.com',
-        'coca cola': 'coca-cola.com',
-        'pepsi': 'pepsi.com',
-        'nike': 'nike.com',
-        'adidas': 'adidas.com',
-        'walmart': 'walmart.com',
-        'target': 'target.com',
-        'home depot': 'homedepot.com',
-        'best buy': 'bestbuy.com'
-    }
-    
     # Check for direct matches first
-    if clean_name in domain_mappings:
-        return domain_mappings[clean_name]
+    domain = DOMAIN_MAPPINGS.get(clean_name)
+    if domain:
+        return domain
     
     # Check for partial matches
-    for company, domain in domain_mappings.items():
+    for company, domain in DOMAIN_MAPPINGS.items():
         if company in clean_name or clean_name in company:
             return domain
     
     # Fallback: try to construct domain from company name
     # Remove common words and create potential domain
-    words_to_remove = ['inc', 'corp', 'corporation', 'company', 'ltd', 'llc', 'the', 'and', '&']
-    name_parts = [word for word in clean_name.split() if word not in words_to_remove]
+    name_parts = [word for word in clean_name.split() if word not in COMPANY_NAME_STOPWORDS]
     
     if name_parts:
         potential_domain = ''.join(name_parts) + '.com'
         return potential_domain
     
-    return clean_name + '.com'
\ No newline at end of file
+    return clean_name + '.com'
@@ -4,22 +4,31 @@ Market Map Generator Backend API Test Script
 This script tests the functionality of the Market Map Generator backend API endpoints.
 """
 
-import requests
+import asyncio
+import httpx
 import json
-import os
 import sys
 import time
+from functools import lru_cache
+from pathlib import Path
 from typing import Dict, Any, Optional, Tuple
 
+# uvloop is optional; it gives a faster event loop for the concurrent checks
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 # Get the backend URL from the frontend/.env file
+@lru_cache(maxsize=1)
 def get_backend_url() -> str:
     """Read the backend URL from the frontend/.env file"""
-    env_path = os.path.join('/app', 'frontend', '.env')
-    with open(env_path, 'r') as f:
-        for line in f:
-            if line.startswith('REACT_APP_BACKEND_URL='):
-                return line.strip().split('=')[1].strip('"\'')
-    raise ValueError("Backend URL not found in frontend/.env")
+    env_text = Path('/app', 'frontend', '.env').read_text()
+    # Leading newline so the key also matches on the first line, and only at a line start
+    _, found, rest = ('\n' + env_text).partition('\nREACT_APP_BACKEND_URL=')
+    if not found:
+        raise ValueError("Backend URL not found in frontend/.env")
+    return rest.split('\n', 1)[0].strip().split('=')[0].strip('"\'')
 
 # Sample market data for testing
 SAMPLE_MARKET_DATA = {
@@ -40,37 +49,46 @@ class MarketMapAPITester:
         self.base_url = get_backend_url()
         self.api_url = f"{self.base_url}/api"
         self.analysis_id = None
-        self.session = requests.Session()
+        self.client = httpx.AsyncClient(
+            base_url=self.api_url,
+            timeout=60.0,
+            limits=httpx.Limits(max_keepalive_connections=10)
+        )
         print(f"Using API URL: {self.api_url}")
     
-    def run_all_tests(self) -> bool:
-        """Run all API tests and return overall success status"""
-        tests = [
-            ("API Health Check", self.test_api_health),
-            ("Integration Status", self.test_integrations),
-            ("Market Analysis", self.test_analyze_market),
-            ("Analysis History", self.test_analysis_history),
-            ("Export Market Map", self.test_export_market_map)
-        ]
+    async def run_test(self, test_name: str, test_func) -> Tuple[str, str, str]:
+        """Run a single test and return its (name, status, message) result"""
+        print(f"\n{'=' * 50}")
+        print(f"Running Test: {test_name}")
+        print(f"{'=' * 50}")
         
-        all_passed = True
-        results = []
+        try:
+            success, message = await test_func()
+            status = "✅ PASSED" if success else "❌ FAILED"
+            return test_name, status, message
+        except Exception as e:
+            print(f"Error during test: {e}")
+            return test_name, "❌ ERROR", str(e)
+    
+    async def run_all_tests(self) -> bool:
+        """Run all API tests and return overall success status"""
+        try:
+            # These tests don't depend on each other, so run them concurrently
+            health_result, integrations_result = await asyncio.gather(
+                self.run_test("API Health Check", self.test_api_health),
+                self.run_test("Integration Status", self.test_integrations)
+            )
+            # History should include the analysis this creates, and export needs its id
+            analysis_result = await self.run_test("Market Analysis", self.test_analyze_market)
+            history_result, export_result = await asyncio.gather(
+                self.run_test("Analysis History", self.test_analysis_history),
+                self.run_test("Export Market Map", self.test_export_market_map)
+            )
+        finally:
+            await self.client.aclose()
         
-        for test_name, test_func in tests:
-            print(f"\n{'=' * 50}")
-            print(f"Running Test: {test_name}")
-            print(f"{'=' * 50}")
-            
-            try:
-                success, message = test_func()
-                status = "✅ PASSED" if success else "❌ FAILED"
-                results.append((test_name, status, message))
-                if not success:
-                    all_passed = False
-            except Exception as e:
-                results.append((test_name, "❌ ERROR", str(e)))
-                all_passed = False
-                print(f"Error during test: {e}")
+        results = [health_result, integrations_result, analysis_result, history_result, export_result]
+        all_passed = all(status == "✅ PASSED" for _, status, _ in results)
         
         # Print summary
         print("\n\n")
@@ -84,10 +102,10 @@ class MarketMapAPITester:
         
         return all_passed
     
-    def test_api_health(self) -> Tuple[bool, str]:
+    async def test_api_health(self) -> Tuple[bool, str]:
         """Test the API health check endpoint"""
         try:
-            response = self.session.get(f"{self.api_url}/")
+            response = await self.client.get("/")
             if response.status_code != 200:
                 return False, f"Expected status code 200, got {response.status_code}"
             
@@ -103,10 +121,10 @@ class MarketMapAPITester:
         except Exception as e:
             return False, f"API health check failed: {str(e)}"
     
-    def test_integrations(self) -> Tuple[bool, str]:
+    async def test_integrations(self) -> Tuple[bool, str]:
         """Test the integrations status endpoint"""
         try:
-            response = self.session.get(f"{self.api_url}/test-integrations")
+            response = await self.client.get("/test-integrations")
             if response.status_code != 200:
                 return False, f"Expected status code 200, got {response.status_code}"
             
@@ -127,12 +145,14 @@ class MarketMapAPITester:
         except Exception as e:
             return False, f"Integration status check failed: {str(e)}"
     
-    def test_analyze_market(self) -> Tuple[bool, str]:
+    async def test_analyze_market(self) -> Tuple[bool, str]:
         """Test the market analysis endpoint"""
         try:
-            response = self.session.post(
-                f"{self.api_url}/analyze-market",
-                json=SAMPLE_MARKET_DATA
+            # AI analysis can take several minutes
+            response = await self.client.post(
+                "/analyze-market",
+                json=SAMPLE_MARKET_DATA,
+                timeout=300.0
             )
             if response.status_code != 200:
                 return False, f"Expected status code 200, got {response.status_code}"
@@ -170,10 +190,10 @@ class MarketMapAPITester:
         except Exception as e:
             return False, f"Market analysis test failed: {str(e)}"
     
-    def test_analysis_history(self) -> Tuple[bool, str]:
+    async def test_analysis_history(self) -> Tuple[bool, str]:
         """Test the analysis history endpoint"""
         try:
-            response = self.session.get(f"{self.api_url}/analysis-history")
+            response = await self.client.get("/analysis-history")
             if response.status_code != 200:
                 return False, f"Expected status code 200, got {response.status_code}"
             
@@ -194,50 +214,54 @@ class MarketMapAPITester:
         except Exception as e:
             return False, f"Analysis history test failed: {str(e)}"
     
-    def test_export_market_map(self) -> Tuple[bool, str]:
+    async def test_export_market_map(self) -> Tuple[bool, str]:
         """Test the export market map endpoint"""
         if not self.analysis_id:
             print("No analysis ID available, running market analysis first...")
-            success, _ = self.test_analyze_market()
+            success, _ = await self.test_analyze_market()
             if not success:
                 return False, "Failed to get analysis ID for export test"
         
         try:
-            response = self.session.get(
-                f"{self.api_url}/export-market-map/{self.analysis_id}",
-                stream=True
-            )
-            if response.status_code != 200:
-                return False, f"Expected status code 200, got {response.status_code}"
-            
-            # Check content type
-            content_type = response.headers.get('Content-Type')
-            expected_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            if content_type != expected_type:
-                return False, f"Expected content type '{expected_type}', got '{content_type}'"
-            
-            # Check content disposition
-            content_disposition = response.headers.get('Content-Disposition')
-            if not content_disposition or 'attachment' not in content_disposition:
-                return False, f"Invalid Content-Disposition: {content_disposition}"
-            
-            # Check file size
-            content_length = int(response.headers.get('Content-Length', 0))
-            if content_length <= 0:
-                return False, f"Invalid Content-Length: {content_length}"
-            
-            print(f"Export Response Headers: {dict(response.headers)}")
-            print(f"Excel file size: {content_length} bytes")
+            async with self.client.stream("GET", f"/export-market-map/{self.analysis_id}") as response:
+                if response.status_code != 200:
+                    return False, f"Expected status code 200, got {response.status_code}"
+                
+                # Check content type
+                content_type = response.headers.get('Content-Type')
+                expected_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                if content_type != expected_type:
+                    return False, f"Expected content type '{expected_type}', got '{content_type}'"
+                
+                # Check content disposition
+                content_disposition = response.headers.get('Content-Disposition')
+                if not content_disposition or 'attachment' not in content_disposition:
+                    return False, f"Invalid Content-Disposition: {content_disposition}"
+                
+                # Check file size
+                content_length = int(response.headers.get('Content-Length', 0))
+                if content_length <= 0:
+                    return False, f"Invalid Content-Length: {content_length}"
+                
+                # Drain the body so the connection goes straight back to the pool
+                size = 0
+                async for chunk in response.aiter_bytes(1 << 16):
+                    size += len(chunk)
+                if size != content_length:
+                    return False, f"Downloaded {size} bytes, expected Content-Length {content_length}"
+                
+                print(f"Export Response Headers: {dict(response.headers)}")
+                print(f"Excel file size: {size} bytes")
             
             return True, "Export market map test passed"
         except Exception as e:
             return False, f"Export market map test failed: {str(e)}"
 
-
 if __name__ == "__main__":
     print("Starting Market Map Generator API Tests")
     tester = MarketMapAPITester()
-    success = tester.run_all_tests()
+    run = uvloop.run if uvloop else asyncio.run
+    success = run(tester.run_all_tests())
     
     if success:
         print("\n✅ All tests passed successfully!")
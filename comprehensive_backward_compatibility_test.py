@@ -10,10 +10,14 @@ Tests all specific requirements from the review request:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import os
 import sys
-from typing import Dict, Any, List, Tuple
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Tuple, Union
 
 def get_backend_url() -> str:
     """Read the backend URL from the frontend/.env file"""
@@ -31,9 +35,63 @@ class ComprehensiveBackwardCompatibilityTester:
         self.base_url = get_backend_url()
         self.api_url = f"{self.base_url}/api"
         self.session = requests.Session()
+        # One pooled connection per worker thread, so concurrent fetches don't
+        # reconnect; GETs are retried on gateway errors
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=32,
+            # raise_on_status=False hands back the last error response, so tests still report "HTTP 502"
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=[502, 503, 504], raise_on_status=False)
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        # Per-analysis GETs are I/O bound, so each test fans them out over this pool
+        self.pool = ThreadPoolExecutor(max_workers=16)
+        # analysis ID -> future (status code, body), shared by every test that loads it
+        self.analysis_requests: Dict[str, "Future[Tuple[int, Any]]"] = {}
+        self.analysis_requests_lock = threading.Lock()
         self.test_results = []
         print(f"Testing at: {self.api_url}")
     
+    def fetch_headers(self, url: str) -> Union[requests.Response, Exception]:
+        """Fetch a URL's headers without its body, returning the response or the exception it raised.
+
+        The export routes are GET-only, so stream the GET and close it before
+        the body is read.
+        """
+        try:
+            response = self.session.get(url, stream=True)
+            response.close()
+            return response
+        except Exception as e:
+            return e
+    
+    def load_analysis(self, analysis_id: str) -> Tuple[int, Any]:
+        """GET one analysis, returning the status code and, on success, the decoded body"""
+        response = self.session.get(f"{self.api_url}/analysis/{analysis_id}")
+        return response.status_code, (response.json() if response.status_code == 200 else None)
+    
+    def fetch_analyses(self, analysis_ids: List[str]) -> Iterator[Tuple[str, "Future[Tuple[int, Any]]"]]:
+        """Start loading each analysis on the pool, yielding (id, future) in order.
+
+        Four tests load the same analyses, concurrently, so each ID is only
+        requested once and every test waits on the same future.
+        """
+        futures = []
+        with self.analysis_requests_lock:
+            for analysis_id in analysis_ids:
+                future = self.analysis_requests.get(analysis_id)
+                if future is None:
+                    future = self.pool.submit(self.load_analysis, analysis_id)
+                    self.analysis_requests[analysis_id] = future
+                futures.append(future)
+        return zip(analysis_ids, futures)
+    
+    def fetch_all_headers(self, endpoint: str, analysis_ids: List[str]) -> Iterator[Tuple[str, Union[requests.Response, Exception]]]:
+        """Fetch {endpoint}/{id} headers for every analysis ID concurrently, yielding (id, response or exception) in order"""
+        urls = [f"{self.api_url}/{endpoint}/{analysis_id}" for analysis_id in analysis_ids]
+        return zip(analysis_ids, self.pool.map(self.fetch_headers, urls))
+    
     def run_all_tests(self) -> bool:
         """Run all comprehensive backward compatibility tests"""
         print("COMPREHENSIVE BACKWARD COMPATIBILITY TEST")
@@ -50,39 +108,53 @@ class ComprehensiveBackwardCompatibilityTester:
             ("Additional: Export Functionality Compatibility", self.test_export_functionality_compatibility)
         ]
         
-        all_passed = True
+        # The history test collects the IDs every other test reads, so it runs
+        # first; the rest are independent and run concurrently
+        (history_name, history_func), *parallel_tests = tests
+        all_passed = self.record_result(history_name, self.run_test(history_func))
         
-        for test_name, test_func in tests:
-            print(f"\n{'='*80}")
-            print(f"TESTING: {test_name}")
-            print(f"{'='*80}")
-            
-            try:
-                success, details = test_func()
-                self.test_results.append({
-                    "test": test_name,
-                    "status": "PASS" if success else "FAIL",
-                    "details": details
-                })
-                
-                if success:
-                    print(f"✅ PASSED: {details}")
-                else:
-                    print(f"❌ FAILED: {details}")
-                    all_passed = False
-                    
-            except Exception as e:
-                print(f"❌ ERROR: {str(e)}")
-                self.test_results.append({
-                    "test": test_name,
-                    "status": "ERROR",
-                    "details": str(e)
-                })
-                all_passed = False
+        # Tests get their own pool: they block on fetches queued to self.pool
+        with ThreadPoolExecutor(max_workers=len(parallel_tests)) as test_pool:
+            futures = [(test_name, test_pool.submit(self.run_test, test_func)) for test_name, test_func in parallel_tests]
+            # Report in the listed order so the output reads like a serial run
+            for test_name, future in futures:
+                all_passed = self.record_result(test_name, future.result()) and all_passed
+        
+        # Each test catches its own errors, so every fetch is done by now
+        self.pool.shutdown()
         
         self.print_final_summary()
         return all_passed
     
+    def run_test(self, test_func) -> Tuple[str, str]:
+        """Run a single test, returning its status ("PASS", "FAIL" or "ERROR") and details"""
+        try:
+            success, details = test_func()
+            return ("PASS" if success else "FAIL"), details
+        except Exception as e:
+            return "ERROR", str(e)
+    
+    def record_result(self, test_name: str, result: Tuple[str, str]) -> bool:
+        """Print a finished test's result, add it to test_results and return whether it passed"""
+        status, details = result
+        print(f"\n{'='*80}")
+        print(f"TESTING: {test_name}")
+        print(f"{'='*80}")
+        
+        if status == "PASS":
+            print(f"✅ PASSED: {details}")
+        elif status == "FAIL":
+            print(f"❌ FAILED: {details}")
+        else:
+            print(f"❌ ERROR: {details}")
+        
+        self.test_results.append({
+            "test": test_name,
+            "status": status,
+            "details": details
+        })
+        return status == "PASS"
+    
     def test_analysis_history_endpoint(self) -> Tuple[bool, str]:
         """Test that the analysis history endpoint still works correctly"""
         try:
@@ -129,12 +201,11 @@ class ComprehensiveBackwardCompatibilityTester:
         successful_loads = 0
         failed_loads = []
         
-        for analysis_id in test_ids:
+        for analysis_id, pending in self.fetch_analyses(test_ids):
             try:
-                response = self.session.get(f"{self.api_url}/analysis/{analysis_id}")
+                status_code, data = pending.result()
                 
-                if response.status_code == 200:
-                    data = response.json()
+                if status_code == 200:
                     
                     # Verify basic structure
                     if "market_input" in data and "market_map" in data:
@@ -142,7 +213,7 @@ class ComprehensiveBackwardCompatibilityTester:
                     else:
                         failed_loads.append(f"{analysis_id}: Missing required structure")
                 else:
-                    failed_loads.append(f"{analysis_id}: HTTP {response.status_code}")
+                    failed_loads.append(f"{analysis_id}: HTTP {status_code}")
                     
             except Exception as e:
                 failed_loads.append(f"{analysis_id}: Exception {str(e)}")
@@ -163,14 +234,13 @@ class ComprehensiveBackwardCompatibilityTester:
         analyses_with_proper_defaults = 0
         field_issues = []
         
-        for analysis_id in test_ids:
+        for analysis_id, pending in self.fetch_analyses(test_ids):
             try:
-                response = self.session.get(f"{self.api_url}/analysis/{analysis_id}")
+                status_code, data = pending.result()
                 
-                if response.status_code != 200:
+                if status_code != 200:
                     continue
                 
-                data = response.json()
                 market_map = data.get("market_map", {})
                 
                 # Check the specific fields mentioned in the fix
@@ -222,12 +292,11 @@ class ComprehensiveBackwardCompatibilityTester:
         retrieval_errors = []
         perspective_distribution = {"existing_brand": 0, "new_entrant": 0, "other": 0}
         
-        for analysis_id in test_ids:
+        for analysis_id, pending in self.fetch_analyses(test_ids):
             try:
-                response = self.session.get(f"{self.api_url}/analysis/{analysis_id}")
+                status_code, data = pending.result()
                 
-                if response.status_code == 200:
-                    data = response.json()
+                if status_code == 200:
                     
                     # Verify complete structure
                     if "market_input" in data and "market_map" in data and "visual_map" in data:
@@ -243,7 +312,7 @@ class ComprehensiveBackwardCompatibilityTester:
                     else:
                         retrieval_errors.append(f"{analysis_id}: Incomplete structure")
                 else:
-                    retrieval_errors.append(f"{analysis_id}: HTTP {response.status_code}")
+                    retrieval_errors.append(f"{analysis_id}: HTTP {status_code}")
                     
             except Exception as e:
                 retrieval_errors.append(f"{analysis_id}: Exception {str(e)}")
@@ -275,14 +344,13 @@ class ComprehensiveBackwardCompatibilityTester:
         visual_map_issues = []
         firmographic_handling = {"with_firmographics": 0, "without_firmographics": 0}
         
-        for analysis_id in test_ids:
+        for analysis_id, pending in self.fetch_analyses(test_ids):
             try:
-                response = self.session.get(f"{self.api_url}/analysis/{analysis_id}")
+                status_code, data = pending.result()
                 
-                if response.status_code != 200:
+                if status_code != 200:
                     continue
                 
-                data = response.json()
                 visual_map = data.get("visual_map")
                 
                 if visual_map is None:
@@ -341,9 +409,11 @@ class ComprehensiveBackwardCompatibilityTester:
         successful_exports = 0
         export_issues = []
         
-        for analysis_id in test_ids:
+        # Only the headers are checked, so don't download the workbooks
+        for analysis_id, response in self.fetch_all_headers("export-market-map", test_ids):
             try:
-                response = self.session.get(f"{self.api_url}/export-market-map/{analysis_id}")
+                if isinstance(response, Exception):
+                    raise response
                 
                 if response.status_code == 200:
                     content_type = response.headers.get('Content-Type')